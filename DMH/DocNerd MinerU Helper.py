@@ -1,17 +1,22 @@
-from os import path, walk, getenv
+from os import path, getenv, remove, cpu_count
 from sys import argv, exit
 from time import time, strftime, localtime, sleep
-from requests import post, put, get
+from random import uniform
 import requests
-from zipfile import ZipFile
-from io import BytesIO
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.util.retry import Retry
+from tempfile import NamedTemporaryFile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from threading import Lock
 import subprocess
+import ssl
 
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QAction, QLabel, QDialog, QTextEdit, QStackedWidget, QFileDialog
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QIcon, QTextCursor
 
-from my_tips import find_txts, extract_md, data_to_json, path_check
+from my_tips import find_txts, clean_md_dir, open_jsonl_log, append_jsonl, path_check, file_digest, flags_fingerprint, load_manifest, save_manifest, extract_zip
 
 # 优先加载 .env（若安装了 python-dotenv）
 try:
@@ -21,16 +26,77 @@ try:
         load_dotenv(_env_path, override=False)
 except Exception:
     pass
+
+# 可选依赖：orjson（请求体编码、轮询响应解码更快，缺失时回退标准库 json）；json_dumps 统一返回 UTF-8 bytes
+try:
+    from orjson import loads as json_loads, dumps as json_dumps  # type: ignore
+except Exception:
+    from json import loads as json_loads, dumps as _json_dumps
+
+    def json_dumps(obj):
+        return _json_dumps(obj, ensure_ascii=False).encode('utf-8')
+
 from my_styles import choose_font, choose_style
 from my_dialogs_com import HTMLDialog, StateDialog
 from my_dialogs_DMH import MinerUAPIDialog, MinerUFolderDialog
 
 
+# MinerU 解析任务的终态
+TERMINAL_STATES = frozenset({'done', 'failed'})
+
+# 预签名 URL 上传并发数（纯 I/O，各文件互不依赖）
+UPLOAD_WORKERS = 8
+
+# 结果 ZIP 下载并发数（下载与解压在同一工作线程内流水进行）
+# 解压由 extract_zip 逐成员以 copyfileobj 流式完成，zlib 解压期间会释放 GIL，各线程的解压可在多核上并行，且不占用 QThread 本身
+DOWNLOAD_WORKERS = 8
+
+# full.md 清洗进程数（CPU 密集）
+CLEAN_WORKERS = cpu_count() or 1
+
+# 逐文件状态消息模板（每个文件各发一条，模块级定义一次，循环内只做格式化）
+MSG_UPLOAD_OK = "{name} uploaded successfully.\n"
+MSG_UPLOAD_FAILED = "{name} uploaded failed!\n"
+MSG_PROCESS_FAILED = "Failed to process {name}!\nError: {err}\n"
+MSG_DOWNLOADED = "{name} has been downloaded to:\n{path}\n"
+MSG_NOT_DOWNLOADED = "{name} was not downloaded!\nLink: ...{link}\n"
+MSG_UNCHANGED = "Unchanged, skipped: {name}\n"
+MSG_CONVERTED = "Conversion completed!\nMD: {md}\nTXT: {txt}\n"
+
+# 全模块共用的 Session：申请上传链接、并发 PUT、轮询结果与下载 ZIP 均复用连接池，摊薄 TLS 握手
+# GET 遇到网关类暂时错误（502/503/504）时由连接池自动退避重试；POST/PUT 的请求体不可安全重放，不自动重试
+# 只按状态码重试：连接/读取超时与 SSL 错误不在这里重试，交给调用方自己的重试与兜底（ZIP 下载 180 s 超时，重复等待代价太大）
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=UPLOAD_WORKERS + DOWNLOAD_WORKERS,
+    max_retries=Retry(
+        total=5, connect=0, read=0, other=0,
+        backoff_factor=1, status_forcelist=[502, 503, 504], allowed_methods=frozenset({"GET"}),
+    ),
+))
+
+
+def _tls12_pool_manager(verify):
+    """ZIP 下载的 urllib3 兜底连接池：限定 TLS 1.2（SSL EOF 多出在 TLS 1.3 协商上），verify=False 时不校验证书"""
+
+    ctx = ssl.create_default_context()
+    ctx.maximum_version = ssl.TLSVersion.TLSv1_2
+    if not verify:
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+    return PoolManager(ssl_context=ctx, maxsize=DOWNLOAD_WORKERS, retries=Retry(total=3, backoff_factor=0.5))
+
+
+# 两档兜底连接池在模块加载时各建一次，与 http_session 一样跨文件复用，连接不会随临时对象被丢弃而悬空
+TLS12_POOLS = {verify: _tls12_pool_manager(verify) for verify in (True, False)}
+
+
 class MinerUWorker(QThread):
     """MinerU工作线程类"""
     
     id_text = pyqtSignal(str)
-    update_text = pyqtSignal(str)
+    update_text = pyqtSignal(list)
     error_signal = pyqtSignal(str)
     update_status = pyqtSignal(str)
 
@@ -47,8 +113,14 @@ class MinerUWorker(QThread):
         self.pdf_folder_path = pdf_folder_path
         self.md_folder_path = md_folder_path
         self.txt_folder_path = txt_folder_path
-        
-        self.log_json = []
+
+        # 本次运行中是否已有 ZIP 在开启证书校验时下载成功（只记录校验开启的成功，关闭校验始终只是单个文件的兜底）
+        self._verify_works = False
+
+        # 状态消息缓冲：攒够条数或超过时间间隔再跨线程发给 GUI
+        self._text_buffer = []
+        self._text_lock = Lock()
+        self._last_flush = time()
         
     def run(self):
         """运行线程"""
@@ -57,19 +129,52 @@ class MinerUWorker(QThread):
             self.run_mineru_task()
         except Exception as e:
             self.error_signal.emit(f"Error in MinerU task: {str(e)}")
+        finally:
+            self.flush_text()
+
+    def post_text(self, text):
+        """缓存一条状态消息，每 32 条或每 0.1 s 批量发送一次"""
+
+        with self._text_lock:
+            self._text_buffer.append(text)
+            if len(self._text_buffer) < 32 and time() - self._last_flush < 0.1:
+                return
+            texts, self._text_buffer = self._text_buffer, []
+            self._last_flush = time()
+
+        self.update_text.emit(texts)
+
+    def flush_text(self):
+        """立即发送缓冲中的全部状态消息"""
+
+        with self._text_lock:
+            texts, self._text_buffer = self._text_buffer, []
+            self._last_flush = time()
+
+        if texts:
+            self.update_text.emit(texts)
     
     def run_mineru_task(self):
         """执行 MinerU 任务"""
 
-        self.update_text.emit("------------------------------------\n")
+        self.post_text("------------------------------------\n")
         
         start_time = time()
-        self.update_text.emit("<b>Start Time:</b>")
-        self.update_text.emit(f"{strftime('%Y-%m-%d %H:%M:%S', localtime())}\n")
+        self.post_text("<b>Start Time:</b>")
+        self.post_text(f"{strftime('%Y-%m-%d %H:%M:%S', localtime())}\n")
+
+        # 清洗清单：记录每个目录已清洗的 full.md 摘要（附清洗开关指纹），内容与开关未变且输出仍在时跳过（MINERU_FORCE_CLEAN=1 强制重洗）
+        manifest_path = path.join(self.txt_folder_path, '.clean_manifest.json')
+        # 强制重洗只跳过“未变即跳过”的判断，清单照常载入：否则本次写回时会抹掉未经手目录的记录
+        force_clean = (getenv('MINERU_FORCE_CLEAN') or '0') != '0'
+        manifest = load_manifest(manifest_path)
+        clean_flags = flags_fingerprint()
 
         all_pdf_file_paths = find_txts(self.pdf_folder_path, extension='.pdf')
-        # 排序以确保 0001.pdf, 0002.pdf ... 的顺序一致
-        all_pdf_file_paths = sorted(all_pdf_file_paths, key=lambda p: path.basename(p))
+        # 排序以确保 0001.pdf, 0002.pdf ... 的顺序一致；文件名只计算一次，与路径一同切片分块
+        pairs = sorted((path.basename(p), p) for p in all_pdf_file_paths)
+        all_pdf_file_names = [name for name, _ in pairs]
+        all_pdf_file_paths = [p for _, p in pairs]
 
         # 采样控制：支持通过环境变量限制起始与条数（MINERU_START/MINERU_LIMIT）
         try:
@@ -84,176 +189,275 @@ class MinerUWorker(QThread):
             start_idx = 0
         if limit_cnt and limit_cnt > 0:
             all_pdf_file_paths = all_pdf_file_paths[start_idx:start_idx + limit_cnt]
+            all_pdf_file_names = all_pdf_file_names[start_idx:start_idx + limit_cnt]
         elif start_idx:
             all_pdf_file_paths = all_pdf_file_paths[start_idx:]
+            all_pdf_file_names = all_pdf_file_names[start_idx:]
 
         if not all_pdf_file_paths:
             self.error_signal.emit("PDF file not found!")
             return
         
-        chunk_pdf_file_paths = [all_pdf_file_paths[i:i + 190] for i in range(0, len(all_pdf_file_paths), 190)]
+        chunk_starts = range(0, len(all_pdf_file_paths), 190)
+        chunk_pdf_file_paths = [all_pdf_file_paths[i:i + 190] for i in chunk_starts]
+        chunk_pdf_file_names = [all_pdf_file_names[i:i + 190] for i in chunk_starts]
         # MinerU API 单次最多处理 200 个 pdf 文件，保守使用 190 进行分块
 
-        for chunk_index, pdf_file_paths in enumerate(chunk_pdf_file_paths):
-        
-            pdf_file_names = [path.basename(pdf_file_path) for pdf_file_path in pdf_file_paths]
-            self.update_text.emit(
-                f"There are {len(pdf_file_names)} pdf files in Chunk {chunk_index} of\n{self.pdf_folder_path}\n"
-            )
-
-            data = {
-                "enable_formula": True,
-                "enable_table": True,
-                "language": "ch",
-                "files": [
-                    {"name": pdf_file_name, "is_ocr": False, "data_id": "abcd"} for pdf_file_name in pdf_file_names
-                ],
-            }    # 需要定期查阅 MinerU 官方文档是否对参数的设定做出了更改 (https://mineru.net/apiManage/docs)
-                        
-            try:
+        # 清洗日志整次运行只写一个 LOG_<时间>.jsonl，各分块的清洗结果逐条追加，不在内存里攒整批结果
+        # 清洗进程池同样整次运行只建一个：spawn 启动方式（macOS/Windows）下每个子进程都要重新导入本脚本与 PyQt5，不能每个分块重付一次
+        # 进程池在首次提交任务时才启动子进程，整次运行没有待清洗目录时不会拉起任何进程
+        with open_jsonl_log(self.txt_folder_path) as log_file, ProcessPoolExecutor(max_workers=CLEAN_WORKERS) as executor:
+            log_path = log_file.name
 
-                response = post(
-                    url="https://mineru.net/api/v4/file-urls/batch",
-                    headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"},
-                    json=data,
+            for chunk_index, (pdf_file_paths, pdf_file_names) in enumerate(zip(chunk_pdf_file_paths, chunk_pdf_file_names)):
+        
+                self.post_text(
+                    f"There are {len(pdf_file_names)} pdf files in Chunk {chunk_index} of\n{self.pdf_folder_path}\n"
                 )
 
-                if response.status_code == 200:
+                data = {
+                    "enable_formula": True,
+                    "enable_table": True,
+                    "language": "ch",
+                    "files": [
+                        {"name": pdf_file_name, "is_ocr": False, "data_id": "abcd"} for pdf_file_name in pdf_file_names
+                    ],
+                }    # 需要定期查阅 MinerU 官方文档是否对参数的设定做出了更改 (https://mineru.net/apiManage/docs)
+                        
+                try:
 
-                    result = response.json()
-                    self.update_text.emit("<b>Requests successful.</b>")
-                    self.update_text.emit("")
+                    response = http_session.post(
+                        url="https://mineru.net/api/v4/file-urls/batch",
+                        headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"},
+                        data=json_dumps(data),
+                    )
 
-                    if result["code"] == 0:
+                    if response.status_code == 200:
 
-                        batch_ID = result["data"]["batch_id"]
-                        self.id_text.emit(str(batch_ID))
-                        self.update_text.emit(f"<b>Batch ID: {batch_ID}</b>")
-                        self.update_text.emit("")
+                        result = response.json()
+                        self.post_text("<b>Requests successful.</b>")
+                        self.post_text("")
 
-                        file_urls = result["data"]["file_urls"]
+                        if result["code"] == 0:
 
-                        if len(file_urls) != len(pdf_file_paths):
-                            self.update_text.emit(
-                                "The number of URLs does not match the number of file paths! "
-                                "Please carefully verify after the processing is completed!\n"
-                            )
+                            batch_ID = result["data"]["batch_id"]
+                            self.id_text.emit(str(batch_ID))
+                            self.post_text(f"<b>Batch ID: {batch_ID}</b>")
+                            self.post_text("")
 
-                        for index, file_url in enumerate(result["data"]["file_urls"]):
+                            file_urls = result["data"]["file_urls"]
 
-                            with open(pdf_file_paths[index], 'rb') as f:
-                                res_upload = put(file_url, data=f)
+                            if len(file_urls) != len(pdf_file_paths):
+                                self.post_text(
+                                    "The number of URLs does not match the number of file paths! "
+                                    "Please carefully verify after the processing is completed!\n"
+                                )
 
-                            if res_upload.status_code == 200:
-                                self.update_text.emit(f"{pdf_file_names[index]} uploaded successfully.\n")
-                            else:
-                                self.update_text.emit(f"{pdf_file_names[index]} uploaded failed!\n")
+                            # 并发上传，状态消息仍在本线程中经信号发回 GUI
+                            with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+                                status_codes = executor.map(self._upload_pdf, pdf_file_paths, file_urls)
+
+                                for index, status_code in enumerate(status_codes):
+
+                                    if status_code == 200:
+                                        self.post_text(MSG_UPLOAD_OK.format(name=pdf_file_names[index]))
+                                    else:
+                                        self.post_text(MSG_UPLOAD_FAILED.format(name=pdf_file_names[index]))
+
+                        else:
+                            self.error_signal.emit(f"Failed to enable URL upload! Error:\n{result.msg}")
+                            return
 
                     else:
-                        self.error_signal.emit(f"Failed to enable URL upload! Error:\n{result.msg}")
+                        self.error_signal.emit(
+                            f"Requests failed!\nStatus: {response.status_code}\nResponse: {response}\n"
+                        )
                         return
-
-                else:
-                    self.error_signal.emit(
-                        f"Requests failed!\nStatus: {response.status_code}\nResponse: {response}\n"
-                    )
-                    return
                             
-            except Exception as e:
-                self.error_signal.emit(f"Error for requests:\n{e}\n")
-                return
+                except Exception as e:
+                    self.error_signal.emit(f"Error for requests:\n{e}\n")
+                    return
 
-            check_condition = True
-            task_start_time = time()
+                check_condition = True
+                task_start_time = time()
 
-            while check_condition:
+                # 本分块新解压出的目录，仅对这些目录做清洗，不再重扫整个 md 文件夹
+                new_dirs = []
 
-                try:
+                # 轮询间隔：1 s 起步按 1.5 倍退避至 10 s，每当有新文件完成即重置为 1 s；实际等待叠加 ±20% 抖动
+                poll_delay = 1
+                last_done = 0
 
-                    res = get(
-                        f"https://mineru.net/api/v4/extract-results/batch/{batch_ID}",
-                        headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"},
-                    )
+                # 文件一进入终态即提交下载，与其余文件的解析过程重叠；已提交的文件名不再重复提交
+                submitted = set()
+                futures = {}
 
-                    states = [infos['state'] for infos in res.json()['data']['extract_result']]
+                # 服务端若返回 ETag，下次轮询带上 If-None-Match；状态未变时得到 304，沿用上一轮结果、不再解析响应体
+                poll_headers = {"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"}
 
-                    if all(state in {'done', 'failed'} for state in states):
+                with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
 
-                        self.update_text.emit("<b>Processing completed!</b>")
-                        self.update_text.emit("")
+                    while check_condition:
 
-                        for infos in res.json()['data']['extract_result']:
+                        try:
 
-                            if infos['err_msg']:
-                                self.update_text.emit(
-                                    f"Failed to process {infos['file_name']}!\nError: {infos['err_msg']}\n"
-                                )
+                            res = http_session.get(
+                                f"https://mineru.net/api/v4/extract-results/batch/{batch_ID}",
+                                headers=poll_headers,
+                            )
 
+                            if res.status_code != 304:
+                                etag = res.headers.get('ETag')
+                                if etag:
+                                    poll_headers["If-None-Match"] = etag
+                                # 响应体只解析一次
+                                extract_result = json_loads(res.content)['data']['extract_result']
+                            states = [infos['state'] for infos in extract_result]
+
+                            done_now = sum(state in TERMINAL_STATES for state in states)
+                            if done_now > last_done:
+                                poll_delay = 1
+                                last_done = done_now
                             else:
+                                poll_delay = min(poll_delay * 1.5, 10)
 
-                                download_file_path = path.join(self.md_folder_path, infos["file_name"][:-4])
-                                file_url = infos["full_zip_url"]
-                                ok = self._download_and_extract(file_url, download_file_path)
-                                if ok:
-                                    self.update_text.emit(
-                                        f"{infos['file_name']} has been downloaded to:\n{download_file_path}\n"
-                                    )
-                                else:
-                                    short = file_url.split("/pdf/")[-1] if "/pdf/" in file_url else file_url[-80:]
-                                    self.update_text.emit(
-                                        f"{infos['file_name']} was not downloaded!\nLink: ...{short}\n"
-                                    )
-
-                        check_condition = False
-                        
-                    else:
+                            for infos in extract_result:
+
+                                file_name = infos['file_name']
+
+                                if infos['state'] not in TERMINAL_STATES or file_name in submitted:
+                                    continue
+
+                                submitted.add(file_name)
+                                err_msg = infos['err_msg']
 
-                        self.update_text.emit("Processing......\nThe status will be checked after 10 s.....\n")
+                                if err_msg:
+                                    self.post_text(MSG_PROCESS_FAILED.format(name=file_name, err=err_msg))
 
-                        if time() - task_start_time > 3600:  
-                            self.error_signal.emit("Timeout: Processing time exceeded 60 min!")
+                                else:
+
+                                    file_url = infos["full_zip_url"]
+                                    download_file_path = path.join(self.md_folder_path, file_name[:-4])
+                                    future = executor.submit(self._download_and_extract, file_url, download_file_path)
+                                    futures[future] = (file_name, file_url, download_file_path)
+
+                            if TERMINAL_STATES.issuperset(states):
+
+                                self.post_text("<b>Processing completed!</b>")
+                                self.post_text("")
+
+                                check_condition = False
+
+                            else:
+
+                                wait = poll_delay * uniform(0.8, 1.2)
+                                self.post_text(
+                                    f"Processing......\nThe status will be checked after {wait:.1f} s.....\n"
+                                )
+
+                                if time() - task_start_time > 3600:  
+                                    self.error_signal.emit("Timeout: Processing time exceeded 60 min!")
+                                    return
+
+                                self.flush_text()
+                                sleep(wait)
+
+                        except Exception as e:
+                            self.error_signal.emit(f"Error for requests:\n{e}")
                             return
-                        
-                        sleep(10)
-                    
-                except Exception as e:
-                    self.error_signal.emit(f"Error for requests:\n{e}")
-                    return
+
+                    # 等待全部下载完成，完成一个汇报一个
+                    # 每 0.1 s 醒来一次并送出缓冲消息：下载线程在重试/兜底期间发的进度不会滞留到下一个文件完成
+                    pending = set(futures)
+                    while pending:
+                        done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+
+                        for future in done:
+
+                            file_name, file_url, download_file_path = futures[future]
+
+                            if future.result():
+                                new_dirs.append(download_file_path)
+                                self.post_text(MSG_DOWNLOADED.format(name=file_name, path=download_file_path))
+                            else:
+                                short = file_url.split("/pdf/")[-1] if "/pdf/" in file_url else file_url[-80:]
+                                self.post_text(MSG_NOT_DOWNLOADED.format(name=file_name, link=short))
+
+                        self.flush_text()
                 
-            for root, dirs, files in walk(self.md_folder_path):
+                # 先在本线程筛出需要清洗的目录（内容未变的跳过），再交给进程池并行清洗
+                clean_tasks = []
+
+                for raw_dir in new_dirs:
 
-                for dir_name in dirs:
-                    
-                    md_file_path = path.join(root, dir_name, 'full.md')
+                    md_file_path = path.join(raw_dir, 'full.md')
 
                     if path.exists(md_file_path):
-                        
-                        txt_name = dir_name
+
+                        txt_name = path.basename(raw_dir)
                         txt_file_name = f"{txt_name}.txt"
                         txt_file_path = path.join(self.txt_folder_path, txt_file_name)
 
-                        with open(md_file_path, 'r', encoding='utf-8') as md_file:
-                            content = md_file.readlines()
+                        digest = f"{file_digest(md_file_path)}:{clean_flags}"
+                        if not force_clean and manifest.get(txt_name) == digest and path.exists(txt_file_path):
+                            self.post_text(MSG_UNCHANGED.format(name=txt_name))
+                            continue
+
+                        clean_tasks.append((raw_dir, txt_file_path, txt_name, digest))
+
+                if clean_tasks:
+
+                    # 清洗阶段耗时较长，先把下载阶段缓冲的消息送出
+                    self.flush_text()
+
+                    # extract_md 为纯 Python 正则清洗，受 GIL 限制，改用多进程并行
+                    results = executor.map(
+                        clean_md_dir,
+                        [task[0] for task in clean_tasks], [task[1] for task in clean_tasks],
+                        chunksize=4,
+                    )
+
+                    for (raw_dir, txt_file_path, txt_name, digest), result_info in zip(clean_tasks, results):
 
-                        raw_dir = path.join(root, dir_name)
-                        result_info = extract_md(txt_name, content, txt_file_path, raw_dir)
-                        self.log_json.append(result_info)
+                        append_jsonl(log_file, result_info)
+                        manifest[txt_name] = digest
                         md_out_path = result_info.get('md_path', txt_file_path[:-4] + '.md')
-                        self.update_text.emit(
-                            f"Conversion completed!\nMD: {md_out_path}\nTXT: {txt_file_path}\n"
-                        )
+                        self.post_text(MSG_CONVERTED.format(md=md_out_path, txt=txt_file_path))
 
-        data_to_json(self.txt_folder_path, self.log_json)
+                save_manifest(manifest_path, manifest)
 
-        self.update_text.emit("<b>End Time:</b>")
-        self.update_text.emit(f"{strftime('%Y-%m-%d %H:%M:%S', localtime())}\n")
-        self.update_text.emit("<b>Processing Time:</b>")
-        self.update_text.emit(f"{(time() - start_time) / 60:.2f} min\n")
+        self.post_text("<b>End Time:</b>")
+        self.post_text(f"{strftime('%Y-%m-%d %H:%M:%S', localtime())}\n")
+        self.post_text("<b>Processing Time:</b>")
+        self.post_text(f"{(time() - start_time) / 60:.2f} min\n")
         
-        result_data = {"log_json": self.log_json, "processing_time": (time() - start_time) / 60}
+        self.flush_text()
+
+        result_data = {"log_path": log_path, "processing_time": (time() - start_time) / 60}
         self.finished_signal.emit(result_data)
 
-    # 稳定下载 ZIP 并解压：带重试与 curl 兜底，规避 SSL EOF
+    @staticmethod
+    def _upload_pdf(pdf_file_path, file_url):
+        """将单个 PDF 上传到预签名 URL，返回 HTTP 状态码"""
+
+        with open(pdf_file_path, 'rb') as f:
+            return http_session.put(file_url, data=f).status_code
+
+    @staticmethod
+    def _save_and_extract(chunks, out_dir):
+        """边收边写入 out_dir 下的临时 ZIP（内存只保留一个分块），解压后删除"""
+
+        tmp = NamedTemporaryFile(dir=out_dir, suffix=".zip", delete=False)
+        try:
+            with tmp:
+                for chunk in chunks:
+                    if chunk:
+                        tmp.write(chunk)
+            extract_zip(tmp.name, out_dir)
+        finally:
+            remove(tmp.name)
+
+    # 稳定下载 ZIP 并解压：带重试与 urllib3 / curl 兜底，规避 SSL EOF
     def _download_and_extract(self, zurl: str, out_dir: str, max_retries: int = 6) -> bool:
         try:
             path_check(out_dir)
@@ -262,75 +466,99 @@ class MinerUWorker(QThread):
         # 简短链接片段用于日志
         short = zurl.split("/pdf/")[-1] if "/pdf/" in zurl else zurl[-80:]
         try:
-            self.update_text.emit(f"Downloading ZIP: ...{short}")
+            self.post_text(f"Downloading ZIP: ...{short}")
         except Exception:
             pass
+        # 不带 Connection: close，ZIP 下载复用 http_session 的长连接（curl 兜底仍单独设置短连接）
+        # 复用是安全的：urllib3 取出空闲连接前会检测对端是否已关闭，已断开的直接丢弃重连，不会拿旧连接去读出 SSL EOF；
+        # 传输中出错时响应随 with 关闭，底层 socket 一并关闭，下次取用会重新建立；urllib3/curl 兜底本就使用独立的新连接
         headers = {
             "User-Agent": "Mozilla/5.0",
             "Accept": "application/zip,application/octet-stream,*/*;q=0.8",
-            "Connection": "close",
         }
         delay = 1
-        for _ in range(max_retries):
-            for verify in (True, False):
+        # 证书校验档位：前 2 次开启校验，之后关闭；本次运行已有校验开启的成功时，证书已知可用，requests 重试全程保持校验
+        for attempt in range(max_retries):
+            verify = attempt < 2 or self._verify_works
+            try:
                 try:
-                    try:
-                        self.update_text.emit(f" - try with verify={'on' if verify else 'off'}")
-                    except Exception:
-                        pass
-                    r = requests.get(zurl, headers=headers, timeout=180, stream=True, verify=verify)
+                    self.post_text(f" - try with verify={'on' if verify else 'off'}")
+                except Exception:
+                    pass
+                # 以上下文管理器使用响应：raise_for_status 或解压出错时也会释放连接
+                with http_session.get(zurl, headers=headers, timeout=180, stream=True, verify=verify) as r:
                     r.raise_for_status()
-                    data = BytesIO()
-                    for chunk in r.iter_content(chunk_size=1024 * 128):
-                        if chunk:
-                            data.write(chunk)
-                    data.seek(0)
-                    with ZipFile(data) as zf:
-                        zf.extractall(out_dir)
-                    try:
-                        self.update_text.emit(" - ok (requests)")
-                    except Exception:
-                        pass
-                    return True
+                    self._save_and_extract(r.iter_content(chunk_size=1024 * 1024), out_dir)
+                if verify:
+                    self._verify_works = True
+                try:
+                    self.post_text(" - ok (requests)")
                 except Exception:
                     pass
+                return True
+            except Exception:
+                pass
             sleep(delay)
             delay = min(delay * 2, 32)
-        # curl 兜底（不同 TLS 栈）
+        # 纯 Python 兜底：独立连接池并限定 TLS 1.2（SSL EOF 多出在 TLS 1.3 协商上），免去拉起 curl 子进程
+        try:
+            self.post_text(" - fallback to urllib3 (TLS 1.2)")
+        except Exception:
+            pass
+        for verify in (True, False):
+            try:
+                resp = TLS12_POOLS[verify].request("GET", zurl, headers=headers, timeout=180, preload_content=False)
+                ok = False
+                try:
+                    if resp.status == 200:
+                        self._save_and_extract(resp.stream(1024 * 1024), out_dir)
+                        ok = True
+                finally:
+                    # 未读完（非 200 或中途出错）的连接先关闭再归还，连接池下次取用时会重新建立
+                    if not ok:
+                        resp.close()
+                    resp.release_conn()
+                if not ok:
+                    continue
+                try:
+                    self.post_text(" - ok (urllib3)")
+                except Exception:
+                    pass
+                return True
+            except Exception:
+                pass
+        # curl 兜底（不同 TLS 栈，最后手段）
         try:
             try:
-                self.update_text.emit(" - fallback to curl")
+                self.post_text(" - fallback to curl")
             except Exception:
                 pass
             tmp_zip = path.join(out_dir, "__mineru_tmp__.zip")
             cmd = [
-                "curl", "-L", "--retry", "5", "--connect-timeout", "20", "-m", "180",
+                "curl", "-s", "-L", "--retry", "5", "--connect-timeout", "20", "-m", "180",
                 "-H", "Accept: application/zip,application/octet-stream,*/*;q=0.8",
                 "-H", "Connection: close",
                 "-o", tmp_zip, zurl,
             ]
-            rc = subprocess.run(cmd, capture_output=True)
+            # 输出一律丢弃，只看返回码与文件大小
+            rc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             if rc.returncode != 0 or (not path.exists(tmp_zip)) or path.getsize(tmp_zip) < 128:
                 cmd2 = cmd[:]
                 cmd2.insert(1, "-k")
-                rc2 = subprocess.run(cmd2, capture_output=True)
+                rc2 = subprocess.run(cmd2, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 if rc2.returncode != 0 or (not path.exists(tmp_zip)) or path.getsize(tmp_zip) < 128:
                     try:
-                        self.update_text.emit(" - curl failed")
+                        self.post_text(" - curl failed")
                     except Exception:
                         pass
                     return False
-            with open(tmp_zip, 'rb') as f:
-                data = BytesIO(f.read())
-            with ZipFile(data) as zf:
-                zf.extractall(out_dir)
+            extract_zip(tmp_zip, out_dir)
             try:
-                from os import remove
                 remove(tmp_zip)
             except Exception:
                 pass
             try:
-                self.update_text.emit(" - ok (curl)")
+                self.post_text(" - ok (curl)")
             except Exception:
                 pass
             return True
@@ -369,7 +597,7 @@ class MinerUMainWindow(QMainWindow):
         # PDF 目录若不存在，保留字符串但在运行前进行显式校验与报错指引
 
         self.batch_ID = None
-        self.log_json = []
+        self.log_path = None
 
         self.initUI()
     
@@ -540,21 +768,20 @@ class MinerUMainWindow(QMainWindow):
         state_dialog = StateDialog(state, prompt, parent)
         state_dialog.exec_()
     
-    def update_running_text(self, running_state):
-        """更新 MinerU 运行状态消息"""
+    def update_running_text(self, running_states):
+        """批量追加 MinerU 运行状态消息"""
 
-        self.running_text.append(running_state)
+        for running_state in running_states:
+            self.running_text.append(running_state)
         try:
             self.running_text.moveCursor(QTextCursor.End)
         except Exception:
             pass
-        QApplication.processEvents()
     
     def update_id(self, batch_id):
         """更新 MinerU 运行 ID"""
 
         self.id_label.setText(f"Batch ID: {batch_id}")
-        QApplication.processEvents()
 
     ### 菜单栏功能组件
 
@@ -667,7 +894,7 @@ class MinerUMainWindow(QMainWindow):
     def on_mineru_finished(self, result_data):
         """MinerU 任务完成后的操作"""
 
-        self.log_json = result_data["log_json"]
+        self.log_path = result_data["log_path"]
         self.update_state_dialog("Done", "All processes have been completed successfully.", self)
     
     def on_mineru_error(self, error_message):
@@ -690,6 +917,8 @@ class MinerUMainWindow(QMainWindow):
 
 if __name__ == '__main__':
     
+    # QtWebEngine 在 HTMLDialog 中按需导入；QApplication 创建后再导入需先开启 OpenGL 上下文共享
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(argv)
     
     app.setStyle('Fusion')
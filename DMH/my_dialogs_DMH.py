@@ -1,7 +1,7 @@
 from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QDialog, QPushButton, QTextEdit, QFileDialog, QLineEdit
 from PyQt5.QtCore import Qt
 
-from my_styles import choose_font, choose_style
+from my_styles import choose_font, choose_style, center_on_parent
 
 
 class MinerUAPIDialog(QDialog):
@@ -51,16 +51,7 @@ class MinerUAPIDialog(QDialog):
         
         layout.addLayout(button_layout)
         
-        self.center_dialog()
-    
-    def center_dialog(self):
-        """让对话框在父对话框中央显示"""
-
-        if self.parent():
-            parent_geometry = self.parent().geometry()
-            x = parent_geometry.x() + (parent_geometry.width() - self.width()) // 2
-            y = parent_geometry.y() + (parent_geometry.height() - self.height()) // 2
-            self.move(x, y)
+        center_on_parent(self)
     
     def accept(self):
         """用户点击确定时获取其填写的 MinerU API key"""
@@ -72,6 +63,13 @@ class MinerUAPIDialog(QDialog):
 class MinerUFolderDialog(QDialog):
     """弹出选择 MinerU 导入/导出文件夹路径的对话框"""
 
+    # 各行的默认目录（类加载时构建一次），便于快速开始
+    DEFAULT_FOLDERS = {
+        "pdf": "7-杨皓然-高研院/paper",
+        "md": "mineru_raw",
+        "txt": "md_clean",
+    }
+
     def __init__(
             self,
             parent=None,
@@ -91,40 +89,40 @@ class MinerUFolderDialog(QDialog):
         
         layout = QVBoxLayout(self)
 
+        # 各行与按钮共用的字体、样式只取一次
+        self.label_font = choose_font('label')
+        self.text_font = choose_font('text')
+        self.blue_button_style = choose_style('blue button')
+
         self.create_folder_rows(layout)
         self.create_buttons(layout)
-        self.center_dialog()
+        center_on_parent(self)
     
     def create_folder_rows(self, main_layout):
         """创建导入/导出文件夹选择行"""
         
         self.folder_line_edits = []
-        defaults = {
-            "pdf": "7-杨皓然-高研院/paper",
-            "md": "mineru_raw",
-            "txt": "md_clean",
-        }
         
         for i, label_text in enumerate(self.row_labels):
 
             row_layout = QHBoxLayout()
             
             label = QLabel(f"{label_text}: ")
-            label.setFont(choose_font('label'))
+            label.setFont(self.label_font)
             row_layout.addWidget(label)
 
             line_edit = QLineEdit()
             line_edit.setPlaceholderText(f"Select a folder...")
-            line_edit.setFont(choose_font('text'))
+            line_edit.setFont(self.text_font)
             line_edit.setReadOnly(True)
             # 预填默认目录，便于快速开始
-            if label_text in defaults:
-                line_edit.setText(defaults[label_text])
+            if label_text in self.DEFAULT_FOLDERS:
+                line_edit.setText(self.DEFAULT_FOLDERS[label_text])
             row_layout.addWidget(line_edit)
             
             browse_button = QPushButton("Browse")
-            browse_button.setFont(choose_font('label'))
-            browse_button.setStyleSheet(choose_style('blue button'))         
+            browse_button.setFont(self.label_font)
+            browse_button.setStyleSheet(self.blue_button_style)         
             browse_button.clicked.connect(lambda checked, idx=i: self.browse_folder(idx))
             row_layout.addWidget(browse_button)
             
@@ -152,27 +150,18 @@ class MinerUFolderDialog(QDialog):
         
         ok_button = QPushButton("OK")
         ok_button.clicked.connect(self.accept)
-        ok_button.setFont(choose_font('label'))
+        ok_button.setFont(self.label_font)
         ok_button.setStyleSheet(choose_style('ok button'))
         button_layout.addWidget(ok_button)
         
         cancel_button = QPushButton("Cancel")
         cancel_button.clicked.connect(self.reject)
-        cancel_button.setFont(choose_font('label'))
+        cancel_button.setFont(self.label_font)
         cancel_button.setStyleSheet(choose_style('cancel button'))
         button_layout.addWidget(cancel_button)
         
         main_layout.addLayout(button_layout)
     
-    def center_dialog(self):
-        """让对话框在父对话框中央显示"""
-
-        if self.parent():
-            parent_geometry = self.parent().geometry()
-            x = parent_geometry.x() + (parent_geometry.width() - self.width()) // 2
-            y = parent_geometry.y() + (parent_geometry.height() - self.height()) // 2
-            self.move(x, y)
-    
     def accept(self):
         """用户点击确定时获取其选择的 MinerU 导入/导出文件夹"""
 
@@ -2,7 +2,6 @@ from os import path
 
 from PyQt5.QtWidgets import QVBoxLayout, QLabel, QDialog, QTextEdit
 from PyQt5.QtCore import Qt, QUrl
-from PyQt5.QtWebEngineWidgets import QWebEngineView
 
 # 可选依赖：my_htmls（缺失时兜底）
 try:
@@ -17,7 +16,7 @@ except Exception:
             <p>提示：my_htmls.py 未提供 error_txt_html，已使用内置兜底。</p>
         </body></html>
         """
-from my_styles import choose_font
+from my_styles import choose_font, center_on_parent
 
 
 class HTMLDialog(QDialog):
@@ -38,11 +37,13 @@ class HTMLDialog(QDialog):
         self.resize(1800, 1000)
         
         layout = QVBoxLayout(self)
+        # QtWebEngine 加载代价很高，仅在首次打开 HTML 对话框时导入
+        from PyQt5.QtWebEngineWidgets import QWebEngineView
         self.web_view = QWebEngineView()
         layout.addWidget(self.web_view)
         
         self.load_html_file(html_file_path)
-        self.center_dialog()
+        center_on_parent(self)
     
     def load_html_file(self, html_file_path):
         """加载本地HTML文件"""
@@ -54,15 +55,6 @@ class HTMLDialog(QDialog):
             self.web_view.load(file_url)
         else:
             self.web_view.setHtml(error_txt_html(ab_path))
-    
-    def center_dialog(self):
-        """让对话框在父对话框中央显示"""
-
-        if self.parent():
-            parent_geometry = self.parent().geometry()
-            x = parent_geometry.x() + (parent_geometry.width() - self.width()) // 2
-            y = parent_geometry.y() + (parent_geometry.height() - self.height()) // 2
-            self.move(x, y)
 
 
 class StateDialog(QDialog):
@@ -94,13 +86,4 @@ class StateDialog(QDialog):
         state_prompt.setReadOnly(True)
         layout.addWidget(state_prompt)
         
-        self.center_dialog()
-    
-    def center_dialog(self):
-        """让对话框在父窗口中央显示"""
-
-        if self.parent():
-            parent_geometry = self.parent().geometry()
-            x = parent_geometry.x() + (parent_geometry.width() - self.width()) // 2
-            y = parent_geometry.y() + (parent_geometry.height() - self.height()) // 2
-            self.move(x, y)
+        center_on_parent(self)
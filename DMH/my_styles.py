@@ -1,20 +1,24 @@
+from functools import lru_cache
+
 from PyQt5.QtGui import QFont, QFontDatabase
 
 
+@lru_cache(maxsize=None)
 def _pick_ui_font_family():
-    """选择系统可用的中文/无衬线字体，避免缺失 'Microsoft YaHei UI' 告警。"""
+    """选择系统可用的中文/无衬线字体，避免缺失 'Microsoft YaHei UI' 告警；结果缓存，字体库只查询一次。"""
     prefs = [
         'PingFang SC', 'Hiragino Sans GB', 'Heiti SC',
         'Microsoft YaHei', 'Noto Sans CJK SC', 'Source Han Sans CN',
         'Arial', 'Helvetica'
     ]
-    fams = set(QFontDatabase().families())
+    fams = frozenset(QFontDatabase().families())
     for name in prefs:
         if name in fams:
             return name
     return 'Arial'
 
 
+@lru_cache(maxsize=None)
 def _css_font_stack(primary: str) -> str:
     stack = [primary, 'Hiragino Sans GB', 'Microsoft YaHei', 'Noto Sans CJK SC', 'Arial', 'Helvetica', 'sans-serif']
     def q(n: str) -> str:
@@ -22,32 +26,32 @@ def _css_font_stack(primary: str) -> str:
     return ", ".join(q(n) for n in stack)
 
 
+# 字体规格：类型名 -> (相对基准字号的倍数, 字重)；未列出的类型使用基准字号与默认字重
+_FONT_SPECS = {
+    'label': (1, QFont.Bold),
+    'h1': (2.4, QFont.Bold),
+    'h2': (1.8, QFont.Bold),
+    'h3': (1.2, QFont.Bold),
+}
+
+
+@lru_cache(maxsize=None)
 def choose_font(type):
-    """生成固定样式的字体属性"""
+    """生成固定样式的字体属性（按类型缓存；setFont 按值复制，共享同一 QFont 是安全的）"""
 
     font, size = _pick_ui_font_family(), 10
 
-    if type == 'label':
-        return QFont(font, size, QFont.Bold)
-    
-    elif type == 'h1':
-        return QFont(font, int(size * 2.4), QFont.Bold)
-    
-    elif type == 'h2':
-        return QFont(font, int(size * 1.8), QFont.Bold)
-    
-    elif type == 'h3':
-        return QFont(font, int(size * 1.2), QFont.Bold)
-    
-    else:
+    spec = _FONT_SPECS.get(type)
+    if spec is None:
         return QFont(font, size)
 
+    scale, weight = spec
+    return QFont(font, int(size * scale), weight)
 
-def choose_style(type):
-    """返回固定的风格描述"""
 
-    if type == "green button":
-        return """
+# 固定样式表：类型名 -> QSS 字符串
+_STYLES = {
+    "green button": """
             QPushButton {
                 background-color: #4CAF50;
                 color: white;
@@ -61,10 +65,9 @@ def choose_style(type):
             QPushButton:pressed {
                 background-color: #388E3C;
             }
-        """
-    
-    elif type == "blue button":
-        return """
+        """,
+
+    "blue button": """
             QPushButton {
                 background-color: #0078d4;
                 color: white;
@@ -78,10 +81,9 @@ def choose_style(type):
             QPushButton:pressed {
                 background-color: #005a9e;
             }
-        """
-    
-    elif type == "ok button":
-        return """
+        """,
+
+    "ok button": """
             QPushButton {
                 background-color: #0078d4;
                 color: white;
@@ -96,10 +98,9 @@ def choose_style(type):
             QPushButton:pressed {
                 background-color: #005a9e;
             }
-        """
+        """,
 
-    elif type == "cancel button":
-        return """
+    "cancel button": """
             QPushButton {
                 background-color: #f1f1f1;
                 color: #333;
@@ -113,40 +114,36 @@ def choose_style(type):
             QPushButton:pressed {
                 background-color: #d1d1d1;
             }
-        """
-    
-    elif type == "label":
-        return """
+        """,
+
+    "label": """
            QLabel {
                 color: #000000;
                 padding: 5px;
                 background-color: transparent;
                 border: none;
             }
-        """
-    
-    elif type == "big label":
-        return """
+        """,
+
+    "big label": """
            QLabel {
                 color: #000000;
                 padding: 20px;
                 background-color: transparent;
                 border: none;
             }
-        """
-    
-    elif type == "grey mid label":
-        return """
+        """,
+
+    "grey mid label": """
             QLabel {
                 color: #000000;
                 padding: 10px;
                 background-color: transparent;
                 border: none;
             }
-        """
-    
-    elif type == "state label":
-        return """
+        """,
+
+    "state label": """
             QLabel {
                 color: #000000;
                 padding: 10px;
@@ -155,10 +152,9 @@ def choose_style(type):
                 border-radius: 5px;
                 margin-right: 10px;
             }
-        """
-    
-    elif type == "main window":
-        return """
+        """,
+
+    "main window": """
             QMainWindow {
                 background-color: #f0f0f0;
             }
@@ -174,28 +170,59 @@ def choose_style(type):
             QMenuBar::item:selected {
                 background-color: #d0d0d0;
             }
-        """
-    
-    elif type == "widget":
-        return """
+        """,
+
+    "widget": """
             QWidget {
                 background-color: #f8f9fa;
                 border: 2px solid #dee2e6;
                 border-radius: 15px;
             }
-        """
+        """,
 
-    elif type == "stacked widget":
-        return """
+    "stacked widget": """
             QStackedWidget {
                 background-color: white;
                 border: 1px solid #dee2e6;
                 border-radius: 5px;
                 margin: 10px;
             }
-        """
+        """,
 
-    elif type == "text edit":
+    "small text edit": """
+            QTextEdit {
+                border: 1px solid #ccc;
+                border-radius: 3px;
+                padding: 5px;
+                background-color: white;
+                color: #000000;
+            }
+            QTextEdit:focus {
+                border-color: #0078d4;
+            }
+        """,
+
+    "web view": """
+            QWebEngineView {
+                border: 1px solid #dee2e6;
+                border-radius: 5px;
+                background-color: #f8f9fa;
+            }
+        """,
+
+    "separator": """
+            background-color: #dee2e6;
+            margin: 10px 0;
+        """,
+}
+
+
+@lru_cache(maxsize=None)
+def choose_style(type):
+    """返回固定的风格描述（按类型缓存）"""
+
+    # 输入框样式需嵌入运行时探测到的字体栈，其余类型直接查表
+    if type == "text edit":
         font_stack = _css_font_stack(_pick_ui_font_family())
         return (
             """
@@ -214,22 +241,8 @@ def choose_style(type):
             }
             """
         )
-    
-    elif type == "small text edit":
-        return """
-            QTextEdit {
-                border: 1px solid #ccc;
-                border-radius: 3px;
-                padding: 5px;
-                background-color: white;
-                color: #000000;
-            }
-            QTextEdit:focus {
-                border-color: #0078d4;
-            }
-        """
-    
-    elif type == "line edit":
+
+    if type == "line edit":
         font_stack = _css_font_stack(_pick_ui_font_family())
         return (
             """
@@ -248,21 +261,16 @@ def choose_style(type):
             }
             """
         )
-    
-    elif type == "web view":
-        return """
-            QWebEngineView {
-                border: 1px solid #dee2e6;
-                border-radius: 5px;
-                background-color: #f8f9fa;
-            }
-        """
-    
-    elif type == "separator":
-        return """
-            background-color: #dee2e6;
-            margin: 10px 0;
-        """
 
-    else:
-        return "ERROR"
+    return _STYLES.get(type, "ERROR")
+
+
+def center_on_parent(dialog):
+    """让对话框在父窗口中央显示（各对话框共用）"""
+
+    parent = dialog.parent()
+    if parent:
+        parent_geometry = parent.geometry()
+        x = parent_geometry.x() + (parent_geometry.width() - dialog.width()) // 2
+        y = parent_geometry.y() + (parent_geometry.height() - dialog.height()) // 2
+        dialog.move(x, y)
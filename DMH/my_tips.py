@@ -1,29 +1,198 @@
-from os import path, makedirs, listdir, getenv
+from os import path, makedirs, scandir, getenv
 from time import strftime, localtime
-from json import dump
-from re import match, findall, sub
+from hashlib import blake2b
+from zipfile import ZipFile
+from shutil import copyfileobj
+from functools import lru_cache
 import re
 import json
-import markdown
+from typing import Iterable
+
+# 可选依赖：ijson（流式解析 content_list.json，只物化逐条条目；缺失时整体 json.load）
+try:
+    import ijson  # type: ignore
+except Exception:
+    ijson = None
+
+# 可选依赖：orjson（C 实现的整体解析，比标准库 json 快数倍；缺失时使用 json.loads）
+try:
+    from orjson import loads as orjson_loads  # type: ignore
+except Exception:
+    orjson_loads = None
+
+# 流式解析只在 ijson 使用 C 后端时优先；纯 Python 后端比 orjson 整体解析慢得多
+_STREAM_JSON = ijson is not None and (orjson_loads is None or ijson.backend == 'yajl2_c')
+
+
+def _read_flags():
+    """读取 extract_md 的环境变量开关（默认开启，取值 '0' 关闭）"""
+    return tuple((getenv(name) or '1') != '0' for name in (
+        'MINERU_SPLIT_HEADER', 'MINERU_CLEAN_MATH', 'MINERU_DROP_REFS',
+        'MINERU_REPLACE_TABLES', 'MINERU_DROP_FIG_CAPTIONS'))
+
+
+# 清洗开关在首次使用时读取一次并缓存：调用方（如 GUI）可能在导入本模块之后才加载 .env，不能在导入时读取
+_FLAGS = None
+
+
+def _clean_flags():
+    """返回缓存的清洗开关 (split_header, clean_math, drop_refs, replace_tables, drop_fig_caps)"""
+    global _FLAGS
+    if _FLAGS is None:
+        _FLAGS = _read_flags()
+    return _FLAGS
+
+
+def flags_fingerprint():
+    """当前清洗开关的指纹（如 '11101'），与 full.md 摘要一同记入清洗清单，开关变化时旧结果失效"""
+    return ''.join('1' if flag else '0' for flag in _clean_flags())
+
+
+# extract_md 用到的正则，模块加载时编译一次
+# 图片语法 ![...](url)
+_IMG_PAT = re.compile(r'!\[[^\]]*\]\(([^)]+)\)')
+# 孤儿图注段落开头
+_FIG_CAPTION_PAT = re.compile(r'^(figure|fig\.?|图|scheme|schematic|graph|chart)\s*[\.:]?\s*(?:[A-Za-z]*\s*)?(?:[IVXLCDM]+|S?\d+)\b', re.I)
+# 行内数学环境 $...$（非贪婪，不跨行）
+_MATH_SPAN_PAT = re.compile(r'\$(.+?)\$')
+# 数学文本归一：命令规范化（\bf{ / \mathrm { / \mathsf { 三者的匹配互不重叠，合并为一次扫描、按命令名分派）
+_MATH_CMD_PAT = re.compile(r'\\(bf|mathrm|mathsf)\s*\{')
+_MATH_CMD_REPL = {'bf': '\\mathbf{', 'mathrm': '\\mathrm{', 'mathsf': '\\mathsf{'}
+# 其后依次做数字空格合并、上下标空格规整；每条规则附带匹配必需的字面量，文本中没有时整遍跳过
+# （这几条规则的输出会被后续规则再次匹配，顺序执行的语义不能合并为单次扫描）
+_MATH_RULES_PRE = (
+    (None, re.compile(r'(\d)\s+(\d)'), r'\1\2'),
+    ('^', re.compile(r'\^\s*\{\s*([^}]+)\s*\}'), r'^{\1}'),
+    ('_', re.compile(r'_\s*\{\s*([^}]+)\s*\}'), r'_{\1}'),
+)
+# 化学式：\mathrm / \mathbf / \mathsf 花括号内的多余空格（按此顺序逐个处理）
+_MATH_COMPACT_PATS = tuple(
+    ('\\' + cmd + '{', re.compile(r'(\\' + cmd + r'\{)([^}]*)(\})')) for cmd in ('mathrm', 'mathbf', 'mathsf')
+)
+_MATH_COMPACT_RULES = (
+    (re.compile(r'\s+'), ' '),
+    # 合并大写/小写字母与数字序列中的空格（保守）
+    (re.compile(r'([A-Za-z])\s+([A-Za-z0-9])'), r'\1\2'),
+    # 去掉与 _ 和 ^ 相邻的多余空格
+    (re.compile(r'\s+_'), r'_'),
+    (re.compile(r'\s+\^'), r'^'),
+    (re.compile(r'(\d)\s+(\d)'), r'\1\2'),
+    (re.compile(r'_\s*\{\s*([^}]+)\s*\}'), r'_{\1}'),
+    (re.compile(r'\^\s*\{\s*([^}]+)\s*\}'), r'^{\1}'),
+)
+_MATH_RULES_POST = (
+    # 温度与单位：290^{\circ} C -> 290^{\circ}\mathrm{C}
+    ('^{\\circ}', re.compile(r'(\d+)\s*\^\{\\circ\}\s*C\b'), r'\1^{\\circ}\\mathrm{C}'),
+    # \mathbf 包裹纯数字：去掉
+    ('\\mathbf{', re.compile(r'\\mathbf\{([0-9\.\-]+)\}'), r'\1'),
+    # 花括号内首尾空格清理
+    ('{', re.compile(r'\{\s*([^}]*?)\s*\}'), r'{\1}'),
+)
+# 参考文献：标题行与“参考文献样式行”的各项特征
+_REF_TITLE_PAT = re.compile(r'^(#+\s*)?(参考文献|参考资料|References|Bibliography|Works Cited|Notes and references|References and Notes|Literature Cited)\b', re.I)
+_REF_NUM_PAT = re.compile(r'^(\[\d+[a-z]?\]|\d{1,3}[\.)]|[a-z]\))\s+', re.I)
+_REF_YEAR_PAT = re.compile(r'(19|20)\d{2}')
+_REF_DOI_PAT = re.compile(r'10\.\d{4,9}/\S+', re.I)
+_REF_JOURNAL_PAT = re.compile(r'(Phys\.|Chem\.|Catal\.|Angew\.|ACS |Appl\.|Commun\.|J\.\s|Rev\.|Sci\.|Technol\.|Surf\.|Lett\.)')
+_REF_PAGES_PAT = re.compile(r'\b\d{1,4}\s*[,;]\s*\d{1,4}([–\-]\d{1,4})?')
+# 纯文本导出：去除常见 Markdown 标记
+_MD_LINK_PAT = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+# 行首标记依次为：标题、引用、无序列表、有序列表、表格左边界；各组可选且按原先逐条 sub 的顺序串联，一次匹配即可全部去掉
+_MD_PREFIX_PAT = re.compile(r"^(?:\s{0,3}#{1,6}\s*)?(?:\s{0,3}>\s?)?(?:\s*[-+*]\s+)?(?:\s*\d+[\.)]\s+)?(?:\s*\|)?")
+# 强调/行内代码标记：* 与 _ 无论成对与否都会被删掉，用 translate 一次完成
+_MD_EMPHASIS_TABLE = str.maketrans("", "", "*_")
+# model_split：名称[参数]
+_MODEL_PAT = re.compile(r'^(.*?)\[(.*)\]$')
 
 
 def path_check(directory_path):
     """检查文件夹路径，如果不存在则创建相应的路径"""
 
-    if not path.exists(directory_path):
-        makedirs(directory_path)
+    # 直接尝试创建，已存在时由 exist_ok 吞掉，省去一次 stat
+    # 同名路径是文件时 makedirs 仍会抛 FileExistsError，与原先先判断 path.exists 的做法一致，跳过不报错
+    try:
+        makedirs(directory_path, exist_ok=True)
+    except FileExistsError:
+        pass
 
 
-def data_to_json(directory_path, datas):
-    """将符合 JSON 格式的数据写入 json 文件"""
+def open_jsonl_log(directory_path):
+    """新建 LOG_<时间>.jsonl 并返回文件对象，供清洗结果逐条追加"""
 
     path_check(directory_path)
 
     time_str = str(strftime('%Y%m%d_%H%M%S', localtime()))
-    file_path = path.join(directory_path, f"LOG_{time_str}.json")
+    file_path = path.join(directory_path, f"LOG_{time_str}.jsonl")
 
-    with open(file_path, 'w', encoding='utf-8') as f:
-        dump(datas, f, indent=4, ensure_ascii=False)
+    return open(file_path, 'a', encoding='utf-8')
+
+
+def append_jsonl(file, data):
+    """向 JSONL 文件追加一条记录（一行一个 JSON 对象）"""
+
+    file.write(json.dumps(data, ensure_ascii=False) + '\n')
+
+
+def file_digest(file_path, chunk_size=1024 * 1024):
+    """计算文件内容的 BLAKE2b 摘要（16 字节，十六进制）"""
+
+    h = blake2b(digest_size=16)
+
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+
+    return h.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """读取清洗清单（目录名 -> full.md 摘要），文件不存在或损坏时返回空字典"""
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except Exception:
+        return {}
+
+
+def save_manifest(manifest_path, manifest):
+    """写入清洗清单"""
+
+    dir_path = path.dirname(manifest_path)
+    if dir_path:
+        path_check(dir_path)
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+
+
+def extract_zip(zip_source, out_dir, buffer_size=1024 * 1024):
+    """逐个成员流式解压 ZIP（1 MiB 拷贝缓冲），跳过会逃逸出 out_dir 的成员路径"""
+
+    root = path.realpath(out_dir)
+    # 已确保存在的目录；同一子目录下的多个成员（如 images/ 下的图片）只建一次目录
+    made_dirs = set()
+
+    with ZipFile(zip_source) as zf:
+        for info in zf.infolist():
+
+            target = path.realpath(path.join(root, info.filename))
+            if target != root and not target.startswith(root + path.sep):
+                continue
+
+            if info.is_dir():
+                if target not in made_dirs:
+                    path_check(target)
+                    made_dirs.add(target)
+                continue
+
+            parent = path.dirname(target)
+            if parent not in made_dirs:
+                path_check(parent)
+                made_dirs.add(parent)
+            with zf.open(info) as src, open(target, 'wb') as dst:
+                copyfileobj(src, dst, buffer_size)
 
 
 def find_txts(directory_path, extension='.txt'):
@@ -33,13 +202,11 @@ def find_txts(directory_path, extension='.txt'):
 
     file_infos = []
 
-    for file_name in listdir(directory_path):
-
-        file_path = path.join(directory_path, file_name)
-
-        if path.isfile(file_path):
-            if path.splitext(file_name)[1].lower() == extension:
-                file_infos.append(file_path)
+    # scandir 一次取回目录项，先比对扩展名，再用 DirEntry 缓存的类型信息判断是否为文件
+    with scandir(directory_path) as entries:
+        for entry in entries:
+            if path.splitext(entry.name)[1].lower() == extension and entry.is_file():
+                file_infos.append(entry.path)
 
     return file_infos
 
@@ -47,7 +214,7 @@ def find_txts(directory_path, extension='.txt'):
 def model_split(model, only_name=False):
     """按照 [] 分割模型的名称和特殊参数"""
 
-    matchs = match(r'^(.*?)\[(.*)\]$', model)
+    matchs = _MODEL_PAT.match(model)
     models = [matchs.group(1).strip(), matchs.group(2).strip()] if matchs else [model, ""]
 
     if only_name:
@@ -56,9 +223,88 @@ def model_split(model, only_name=False):
     return {"T": True if models[1] == "T" else False, "t": True if models[1] == "t" else False}    
 
 
+def _normalize_math_text(t: str) -> str:
+    """数学/化学公式的保守归一（仅作用于 $...$ 内部文本）"""
+
+    if '\\' in t:
+        t = _MATH_CMD_PAT.sub(lambda m: _MATH_CMD_REPL[m.group(1)], t)
+
+    for needle, pat, repl in _MATH_RULES_PRE:
+        if needle is None or needle in t:
+            t = pat.sub(repl, t)
+
+    def _compact(m):
+        inner = m.group(2)
+        for pat, repl in _MATH_COMPACT_RULES:
+            inner = pat.sub(repl, inner)
+        return m.group(1) + inner + m.group(3)
+
+    for needle, pat in _MATH_COMPACT_PATS:
+        if needle in t:
+            t = pat.sub(_compact, t)
+
+    for needle, pat, repl in _MATH_RULES_POST:
+        if needle in t:
+            t = pat.sub(repl, t)
+
+    return t
+
+
+def _iter_content_list(file_path):
+    """逐条产出 MinerU *_content_list.json 的条目（顶层可能是 list，也可能是含 content_list 的 dict）"""
+
+    if not _STREAM_JSON:
+        with open(file_path, 'rb') as jf:
+            raw = jf.read()
+        try:
+            data = orjson_loads(raw) if orjson_loads is not None else json.loads(raw.decode('utf-8'))
+        except ValueError:
+            # orjson 不接受 NaN/Infinity 等标准库允许的写法，交回 json 再试一次
+            data = json.loads(raw.decode('utf-8'))
+        yield from (data if isinstance(data, list) else data.get('content_list') or [])
+        return
+
+    with open(file_path, 'rb') as jf:
+        # 按首个非空白字符判断顶层结构，再回到文件开头流式解析
+        head = jf.read(64).lstrip()
+        jf.seek(0)
+        prefix = 'item' if head.startswith(b'[') else 'content_list.item'
+        yield from ijson.items(jf, prefix, use_float=True)
+
+
+def _math_span_repl(m):
+    """_MATH_SPAN_PAT 的替换回调：归一 $...$ 内部文本"""
+
+    return '$' + _normalize_math_text(m.group(1)) + '$'
+
+
+def _is_ref_like(s: str) -> bool:
+    """按编号、年份、DOI、期刊缩写、卷页等特征打分，判断一行是否像参考文献条目"""
+
+    s = s.strip()
+    if not s:
+        return False
+    score = 0
+    # 编号开头
+    if _REF_NUM_PAT.match(s):
+        score += 2
+    # 年份/DOI
+    if _REF_YEAR_PAT.search(s):
+        score += 1
+    if _REF_DOI_PAT.search(s):
+        score += 2
+    # 期刊/出版社常见缩写
+    if _REF_JOURNAL_PAT.search(s):
+        score += 1
+    # 页码/卷期
+    if _REF_PAGES_PAT.search(s):
+        score += 1
+    return score >= 2
+
+
 def extract_md(
     md_name: str,            # md 文件的文件名（不含扩展名）
-    md_lines: list,          # 使用 readlines() 读取的 md 文件的行内容
+    md_lines: Iterable[str], # md 文件的行内容（行列表或以文本模式打开的文件对象，仅逐行迭代一次）
     txt_file_path: str,      # 保存纯文本的 .txt 文件路径（将同时生成同名 .md 文件）
     raw_dir: str = None,     # 对应 mineru_raw/<index> 目录，用于表格替换及辅助清洗
 ) -> dict:
@@ -74,27 +320,17 @@ def extract_md(
     - 同名 .txt：在 Markdown 基础上做轻量标记去除后的纯文本
     """
 
-    # 环境变量控制（默认开启）
-    split_header = (getenv('MINERU_SPLIT_HEADER') or '1') != '0'
-    clean_math = (getenv('MINERU_CLEAN_MATH') or '1') != '0'
-    drop_refs = (getenv('MINERU_DROP_REFS') or '1') != '0'
-    replace_tables = (getenv('MINERU_REPLACE_TABLES') or '1') != '0'
-    drop_fig_caps = (getenv('MINERU_DROP_FIG_CAPTIONS') or '1') != '0'
-
-    # 0) 基础清理：移除不可见字符（如 NUL）
-    md_lines = [l.replace('\x00', '') for l in md_lines]
+    # 环境变量控制（默认开启；首次调用时读取，见 _clean_flags）
+    split_header, clean_math, drop_refs, replace_tables, drop_fig_caps = _clean_flags()
 
     # 0) 构建表格映射（img -> HTML 表格）
     table_map = {}
     if raw_dir and replace_tables and path.exists(raw_dir):
         try:
-            for fn in listdir(raw_dir):
-                if fn.endswith('_content_list.json'):
-                    with open(path.join(raw_dir, fn), 'r', encoding='utf-8') as jf:
-                        data = json.load(jf)
-                    # data 可能是 list 或 dict
-                    items = data if isinstance(data, list) else data.get('content_list') or []
-                    for it in items:
+            # scandir 直接给出完整路径，无需逐项 path.join
+            for entry in scandir(raw_dir):
+                if entry.name.endswith('_content_list.json'):
+                    for it in _iter_content_list(entry.path):
                         try:
                             if (it.get('type') == 'table') and it.get('img_path') and it.get('table_body'):
                                 imgp = it['img_path']  # 如 images/xxx.jpg
@@ -118,157 +354,78 @@ def extract_md(
             pass
 
     # 1) 图片处理：表格图片替换为 HTML 表格，其余图片移除
-    processed_lines = []
     removed_images = []
-    img_pat = re.compile(r'!\[[^\]]*\]\(([^)]+)\)')
-    for line in md_lines:
-        # 逐个替换同一行中的多个图片
-        def repl(m):
-            url = m.group(1)
-            base = path.basename(url)
-            if base in table_map or url in table_map:
-                return table_map.get(base) or table_map.get(url)
-            else:
-                removed_images.append(m.group(0))
-                return ''
-        new_line = img_pat.sub(repl, line)
-        processed_lines.append(new_line)
-
-    # 2) 基础空白清理：去行尾空格 + 折叠空行
-    # 去除行尾空白
-    processed_lines = [l.rstrip() + ("\n" if not l.endswith("\n") else "") for l in processed_lines]
 
-    # 折叠多余空行（保留单个空行），同时去掉首尾空白行
-    collapsed_lines = []
+    # 逐个替换同一行中的多个图片
+    def repl(m):
+        url = m.group(1)
+        base = path.basename(url)
+        if base in table_map or url in table_map:
+            return table_map.get(base) or table_map.get(url)
+        else:
+            removed_images.append(m.group(0))
+            return ''
+
+    # 0)~2) 合并为一次遍历：移除不可见字符（如 NUL）-> 图片处理 -> 去行尾空白 -> 折叠多余空行（保留单个空行）
+    # 此处完成唯一一次迭代，文件对象可直接传入
+    lines = []
     prev_blank = True  # 去掉开头空行
-    for l in processed_lines:
-        is_blank = (l.strip() == "")
+    for l in md_lines:
+        l = l.replace('\x00', '')
+        if '![' in l:
+            l = _IMG_PAT.sub(repl, l)
+        stripped = l.rstrip()
+        # 空行判断直接看去尾空白后的结果，不再额外 strip 一次
+        is_blank = not stripped
         if is_blank and prev_blank:
             continue
-        collapsed_lines.append(l)
+        lines.append(stripped + ("\n" if not l.endswith("\n") else ""))
         prev_blank = is_blank
     # 去掉末尾空行
-    while collapsed_lines and collapsed_lines[-1].strip() == "":
-        collapsed_lines.pop()
-    if collapsed_lines and not collapsed_lines[-1].endswith("\n"):
-        collapsed_lines[-1] += "\n"
-
-    lines = collapsed_lines
+    while lines and lines[-1].strip() == "":
+        lines.pop()
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
 
     # 2) 移除孤儿图注（图片已删，去除以 Figure/ Fig./ FIG./ 图 开头的段落，大小写不敏感）
-    if drop_fig_caps and lines:
+    # 4) 数学/化学公式（保守归一，仅数学环境内，逐个 $...$ 处理、不跨行）
+    # 两步都是逐行处理，合并为一次遍历
+    if (drop_fig_caps or clean_math) and lines:
         new = []
         skip = False
-        pat_fig = re.compile(r'^(figure|fig\.?|图|scheme|schematic|graph|chart)\s*[\.:]?\s*(?:[A-Za-z]*\s*)?(?:[IVXLCDM]+|S?\d+)\b', re.I)
         for ln in lines:
-            s = ln.strip()
-            if not skip and pat_fig.match(s):
-                skip = True
-                continue
-            if skip:
-                if s == '':
-                    skip = False
-                continue
+            if drop_fig_caps:
+                s = ln.strip()
+                if not skip and _FIG_CAPTION_PAT.match(s):
+                    skip = True
+                    continue
+                if skip:
+                    if s == '':
+                        skip = False
+                    continue
+            if clean_math and '$' in ln:
+                ln = _MATH_SPAN_PAT.sub(_math_span_repl, ln)
             new.append(ln)
         lines = new
 
-    # 4) 数学/化学公式（保守归一，仅数学环境内）
-    if clean_math and lines:
-        def normalize_math_text(t: str) -> str:
-            # 命令规范化
-            t = re.sub(r'\\bf\s*\{', r'\\mathbf{', t)
-            t = re.sub(r'\\mathrm\s*\{', r'\\mathrm{', t)
-            t = re.sub(r'\\mathsf\s*\{', r'\\mathsf{', t)
-            # 数字空格合并
-            t = re.sub(r'(\d)\s+(\d)', r'\1\2', t)
-            # 上下标空格规整
-            t = re.sub(r'\^\s*\{\s*([^}]+)\s*\}', r'^{\1}', t)
-            t = re.sub(r'_\s*\{\s*([^}]+)\s*\}', r'_{\1}', t)
-            # 常见化学式：去除 \\mathrm/\\mathbf 内部多余空格
-            def compact_inside(cmd):
-                pattern = re.compile(r'(\\' + cmd + r'\{)([^}]*)(\})')
-                def _rep(m):
-                    inner = m.group(2)
-                    inner = re.sub(r'\s+', ' ', inner)
-                    # 合并大写/小写字母与数字序列中的空格（保守）
-                    inner = re.sub(r'([A-Za-z])\s+([A-Za-z0-9])', r'\1\2', inner)
-                    # 去掉与 _ 和 ^ 相邻的多余空格
-                    inner = re.sub(r'\s+_', r'_', inner)
-                    inner = re.sub(r'\s+\^', r'^', inner)
-                    inner = re.sub(r'(\d)\s+(\d)', r'\1\2', inner)
-                    inner = re.sub(r'_\s*\{\s*([^}]+)\s*\}', r'_{\1}', inner)
-                    inner = re.sub(r'\^\s*\{\s*([^}]+)\s*\}', r'^{\1}', inner)
-                    return m.group(1) + inner + m.group(3)
-                return pattern.sub(_rep, t)
-            for cmd in ('mathrm','mathbf','mathsf'):
-                t = compact_inside(cmd)
-            # 温度与单位：290^{\circ} C -> 290^{\circ}\mathrm{C}
-            t = re.sub(r'(\d+)\s*\^\{\\circ\}\s*C\b', r'\1^{\\circ}\\mathrm{C}', t)
-            # \\mathbf 包裹纯数字：去掉
-            t = re.sub(r'\\mathbf\{([0-9\.\-]+)\}', r'\1', t)
-            # 花括号内首尾空格清理
-            t = re.sub(r'\{\s*([^}]*?)\s*\}', r'{\1}', t)
-            return t
-
-        out_lines = []
-        for ln in lines:
-            # 逐个 $...$ 处理（不跨行）
-            parts = []
-            pos = 0
-            while True:
-                m = re.search(r'\$(.+?)\$', ln[pos:])
-                if not m:
-                    parts.append(ln[pos:])
-                    break
-                start = pos + m.start()
-                end = pos + m.end()
-                # 非贪婪匹配，处理该段
-                math_text = m.group(1)
-                math_norm = normalize_math_text(math_text)
-                parts.append(ln[pos:start])
-                parts.append('$' + math_norm + '$')
-                pos = end
-            out_lines.append(''.join(parts))
-        lines = out_lines
-
     # 4) 参考文献剔除（标题法 + 形态回退更强规则）
     removed_refs = []
     if drop_refs and lines:
         try:
-            title_pat = re.compile(r'^(#+\s*)?(参考文献|参考资料|References|Bibliography|Works Cited|Notes and references|References and Notes|Literature Cited)\b', re.I)
             cut_idx = None
             for i in range(int(len(lines)*0.5), len(lines)):
                 s = lines[i].strip()
-                if title_pat.match(s):
+                if _REF_TITLE_PAT.match(s):
                     cut_idx = i
                     break
             if cut_idx is None:
+                # 后半段每行只打分一次，形态回退与下方的样式块剔除共用同一组结果
+                half = int(len(lines) * 0.5)
+                ref_flags = [_is_ref_like(x) for x in lines[half:]]
+
                 # 形态回退：在文末 40% 内查找“参考文献密集区”
                 start_scan = int(len(lines) * 0.6)
-                window = lines[start_scan:]
-
-                def is_ref_like(s: str) -> bool:
-                    s = s.strip()
-                    if not s:
-                        return False
-                    score = 0
-                    # 编号开头
-                    if re.match(r'^(\[\d+[a-z]?\]|\d{1,3}[\.)]|[a-z]\))\s+', s, flags=re.I):
-                        score += 2
-                    # 年份/DOI
-                    if re.search(r'(19|20)\d{2}', s):
-                        score += 1
-                    if re.search(r'10\.\d{4,9}/\S+', s, flags=re.I):
-                        score += 2
-                    # 期刊/出版社常见缩写
-                    if re.search(r'(Phys\.|Chem\.|Catal\.|Angew\.|ACS |Appl\.|Commun\.|J\.\s|Rev\.|Sci\.|Technol\.|Surf\.|Lett\.)', s):
-                        score += 1
-                    # 页码/卷期
-                    if re.search(r'\b\d{1,4}\s*[,;]\s*\d{1,4}([–\-]\d{1,4})?', s):
-                        score += 1
-                    return score >= 2
-
-                flags = [is_ref_like(x) for x in window]
+                flags = ref_flags[start_scan - half:]
                 # 位置约束：最后 25% 区域
                 last_quarter = int(len(lines) * 0.75)
                 # 寻找“第一个强参考行”的位置
@@ -285,12 +442,10 @@ def extract_md(
                 lines = lines[:cut_idx]
             else:
                 # 进一步：删除位于文后半段的“参考文献样式块”（不整篇截断）
-                start_scan = int(len(lines) * 0.5)
-                i = start_scan
-                new_lines = lines[:start_scan]
+                i = half
+                new_lines = lines[:half]
                 while i < len(lines):
-                    s = lines[i].strip()
-                    if is_ref_like(s):
+                    if ref_flags[i - half]:
                         # 收集连续块（允许空行穿插）
                         j = i
                         block = []
@@ -301,7 +456,7 @@ def extract_md(
                                 block.append(lines[j])
                                 j += 1
                                 continue
-                            if is_ref_like(sj):
+                            if ref_flags[j - half]:
                                 block.append(lines[j])
                                 ref_count += 1
                                 j += 1
@@ -324,56 +479,50 @@ def extract_md(
 
     # 3) 生成 .md 与 .txt 输出路径
     md_file_path = txt_file_path[:-4] + ".md" if txt_file_path.lower().endswith('.txt') else txt_file_path + ".md"
-    # 确保目录存在
-    for out_path in (md_file_path, txt_file_path):
-        dir_path = path.dirname(out_path)
+    # 确保目录存在（.md 与 .txt 通常同目录，只检查一次）
+    for dir_path in {path.dirname(md_file_path), path.dirname(txt_file_path)}:
         if dir_path:
             path_check(dir_path)
 
     # 6) 写入清洗后的 Markdown
-    with open(md_file_path, 'w', encoding='utf-8') as f_md:
-        f_md.writelines(lines)
+    # 拼接后一次写出，只做一次编码与写调用
+    with open(md_file_path, 'w', encoding='utf-8', buffering=1024 * 1024) as f_md:
+        f_md.write(''.join(lines))
 
     # 5) 生成轻量纯文本（去除常见 Markdown 标记）
     def md_to_text(lines: list) -> list:
         out = []
+        prev_blank = True
         for ln in lines:
             s = ln
             # 链接 [text](url) -> text
-            s = sub(r"\[([^\]]+)\]\(([^)]+)\)", r"\1", s)
-            # 强调/删除线/行内代码标记去除，但保留内容
-            s = s.replace("**", "").replace("__", "").replace("*", "").replace("_", "").replace("~~", "").replace("`", "")
-            # 标题/引用/列表标记去除
-            s = sub(r"^\s{0,3}#{1,6}\s*", "", s)          # #, ## ... ######
-            s = sub(r"^\s{0,3}>\s?", "", s)                # blockquote
-            s = sub(r"^\s*[-+*]\s+", "", s)               # unordered list
-            s = sub(r"^\s*\d+[\.)]\s+", "", s)          # ordered list
-            # 表格分隔去除
-            s = sub(r"^\s*\|", "", s)
-            s = s.replace("|", "\t")  # 粗暴转为制表符，保留信息
-            # 代码围栏去除（仅去掉标记，不清空内容）
-            s = sub(r"^\s*```.*$", "", s)
+            if "](" in s:
+                s = _MD_LINK_PAT.sub(r"\1", s)
+            # 强调/删除线/行内代码标记去除，但保留内容（反引号一并删掉，代码围栏标记也就不复存在）
+            s = s.translate(_MD_EMPHASIS_TABLE)
+            if "~" in s:
+                s = s.replace("~~", "")
+            if "`" in s:
+                s = s.replace("`", "")
+            # 标题/引用/列表/表格左边界标记去除
+            s = _MD_PREFIX_PAT.sub("", s, count=1)
+            if "|" in s:
+                s = s.replace("|", "\t")  # 粗暴转为制表符，保留信息
             # 多余空白
             s = s.rstrip()
-            out.append(s + ("\n" if not s.endswith("\n") else ""))
-        # 再次折叠空行
-        final = []
-        prev_blank = True
-        for l in out:
-            blank = (l.strip() == "")
+            # 再次折叠空行（与标记去除同一遍完成）
+            blank = not s
             if blank and prev_blank:
                 continue
-            final.append(l)
+            out.append(s + "\n")
             prev_blank = blank
-        while final and final[-1].strip() == "":
-            final.pop()
-        if final and not final[-1].endswith("\n"):
-            final[-1] += "\n"
-        return final
+        while out and out[-1] == "\n":
+            out.pop()
+        return out
 
     txt_lines = md_to_text(lines)
-    with open(txt_file_path, 'w', encoding='utf-8') as f_txt:
-        f_txt.writelines(txt_lines)
+    with open(txt_file_path, 'w', encoding='utf-8', buffering=1024 * 1024) as f_txt:
+        f_txt.write(''.join(txt_lines))
 
     # 7) 日志信息与参考文献存档
     if removed_refs:
@@ -382,7 +531,7 @@ def extract_md(
             removed_dir = path.join(logs_root, 'removed_refs')
             path_check(removed_dir)
             with open(path.join(removed_dir, f'{md_name}.md'), 'w', encoding='utf-8') as rf:
-                rf.writelines(removed_refs)
+                rf.write(''.join(removed_refs))
         except Exception:
             pass
 
@@ -397,21 +546,23 @@ def extract_md(
     }
 
 
+def clean_md_dir(raw_dir, txt_file_path):
+    """读取 mineru_raw/<index>/full.md 并清洗导出（模块级函数，便于进程池调用）"""
+
+    md_name = path.basename(path.normpath(raw_dir))
+
+    with open(path.join(raw_dir, 'full.md'), 'r', encoding='utf-8', buffering=1024 * 1024) as md_file:
+        return extract_md(md_name, md_file, txt_file_path, raw_dir)
+
+
 def api_key_change(type, value):
     """按照格式转化 API key"""
 
     return getenv(value) if type == "Environment Variable" else value
 
 
-def markdown_to_html(md_text, extensions=None):
-    """将 Markdown 文本转换为 HTML"""
-    
-    if extensions is None:
-        extensions = ['extra', 'fenced_code', 'nl2br', 'admonition']
-    
-    html_body = markdown.markdown(md_text, extensions=extensions)
-    
-    css_style = """
+# markdown_to_html 的页面样式与外层模板，模块加载时拼好，调用时只需嵌入正文
+_HTML_CSS = """
     <style>
         body { 
             max-width: 800px;
@@ -435,17 +586,37 @@ def markdown_to_html(md_text, extensions=None):
         }
     </style>
     """
-    html = f"""<!DOCTYPE html>
+_HTML_HEAD = f"""<!DOCTYPE html>
         <html lang="zh-CN">
         <head>
         <meta charset="UTF-8">
         <title>Markdown Render</title>
         <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/default.min.css">
-        {css_style}
+        {_HTML_CSS}
         </head>
         <body>
-        {html_body}
+        """
+_HTML_TAIL = """
         </body>
         </html>
     """
-    return html
+
+
+@lru_cache(maxsize=8)
+def _get_markdown(extensions: tuple):
+    """按扩展组合缓存 Markdown 实例，扩展处理器只注册一次"""
+
+    import markdown  # 延迟导入：扩展树较大，只做清洗的调用方无需加载
+
+    return markdown.Markdown(extensions=list(extensions))
+
+
+def markdown_to_html(md_text, extensions=None):
+    """将 Markdown 文本转换为 HTML"""
+
+    if extensions is None:
+        extensions = ('extra', 'fenced_code', 'nl2br', 'admonition')
+
+    # reset() 清掉上一次转换留下的状态（脚注、引用链接等）
+    html_body = _get_markdown(tuple(extensions)).reset().convert(md_text)
+    return _HTML_HEAD + html_body + _HTML_TAIL
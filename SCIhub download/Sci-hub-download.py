@@ -1,10 +1,16 @@
 import requests
+from requests.adapters import HTTPAdapter
+import urllib3
 import time
-from bs4 import BeautifulSoup
+import lxml.html
 import os
+import shutil
 import threading
 import concurrent.futures
 import random
+import itertools
+import atexit
+from urllib.parse import urljoin
 import pandas as pd
 
 # 锁对象，用于多线程安全
@@ -23,6 +29,19 @@ scihub_mirrors = [
     "https://sci-hub.st/"
 ]
 
+# 镜像健康状态：连续失败达到阈值后暂时跳过该镜像，避免每个 DOI 都为死镜像白等超时
+mirror_state = {mirror: {"fail": 0, "ban_until": 0} for mirror in scihub_mirrors}
+mirror_fail_limit = 3   # 连续失败次数阈值
+mirror_ban_seconds = 120  # 暂停使用的时长
+
+# 并发下载的工作线程数（纯网络 I/O，线程大部分时间阻塞在 socket 上）
+max_workers = 32
+
+# 共享 Session：工作线程复用到各镜像及 PDF CDN 的长连接，省去每次请求的 TCP+TLS 握手
+# 每个主机的连接池不小于线程数，避免线程间争抢连接而被迫新建/丢弃 socket
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=12, pool_maxsize=max_workers, max_retries=0))
+
 # 随机 User-Agent 列表
 user_agents = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36",
@@ -30,70 +49,154 @@ user_agents = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
 ]
 
+# 每个线程固定一个 User-Agent，免去热路径上对全局随机数生成器的加锁调用
+# 线程首次请求时按轮转顺序分配，保证各 UA 均匀分布
+thread_local = threading.local()
+ua_counter = itertools.count()
+
+def thread_user_agent():
+    ua = getattr(thread_local, "ua", None)
+    if ua is None:
+        ua = thread_local.ua = user_agents[next(ua_counter) % len(user_agents)]
+    return ua
+
+# 按健康度挑选镜像：跳过暂停中的镜像，失败少的排在前面；全部暂停时退回完整列表
+def healthy_mirrors():
+    now = time.time()
+    with lock:
+        mirrors = [m for m in scihub_mirrors if mirror_state[m]["ban_until"] <= now] or scihub_mirrors
+        return sorted(mirrors, key=lambda m: mirror_state[m]["fail"])
+
+# 记录镜像一次请求的成败，返回其当前连续失败次数
+def record_mirror(mirror, ok):
+    with lock:
+        state = mirror_state[mirror]
+        if ok:
+            state["fail"] = 0
+            state["ban_until"] = 0
+        else:
+            state["fail"] += 1
+            if state["fail"] >= mirror_fail_limit:
+                state["ban_until"] = time.time() + mirror_ban_seconds
+        return state["fail"]
+
+# 镜像请求失败后退避：随连续失败次数指数增长，最长 30 秒（成功路径不再等待）
+# 镜像返回 429/503 并给出 Retry-After（秒数）时，至少等到它要求的时间，同样以 30 秒封顶
+def mirror_backoff(fail, retry_after=None):
+    wait = 2 ** fail + random.random()
+    if retry_after and retry_after.strip().isdigit():
+        wait = max(wait, int(retry_after))
+    time.sleep(min(30, wait))
+
 # 下载文献的函数
 def download_paper(doi, index, retries=3):
     print(f"开始处理 DOI: {doi} (Index: {index})")
     for _ in range(retries):  # 尝试指定次数
-        for mirror in scihub_mirrors:
+        for mirror in healthy_mirrors():
             try:
                 url = mirror + doi
-                head = {"user-agent": random.choice(user_agents)}
-                r = requests.get(url, headers=head, timeout=10)  # 设置超时
+                head = {"user-agent": thread_user_agent()}
+                r = session.get(url, headers=head, timeout=10)  # 设置超时
+                fail = record_mirror(mirror, r.status_code == 200)
                 if r.status_code == 200:
-                    soup = BeautifulSoup(r.text, "html.parser")
-                    if soup.iframe is None:
-                        download_url = soup.embed.attrs.get("src")
-                    else:
-                        download_url = soup.iframe.attrs.get("src")
-                    
+                    # 直接交给 lxml 解析字节内容，只取 iframe/embed 的 src
+                    tree = lxml.html.fromstring(r.content)
+                    download_url = (tree.xpath('//iframe/@src') or tree.xpath('//embed/@src') or [None])[0]
+
                     if download_url:
-                        if 'http' not in download_url:
-                            download_url = 'https:' + download_url
-                        download_r = requests.get(download_url, headers=head, timeout=10)
-                        if download_r.status_code == 200 and download_r.content:
-                            filename = f"{index}.pdf"  # 使用Excel A列的Index值作为文件名
-                            with open(path + filename, "wb") as file:
-                                file.write(download_r.content)
+                        # 协议相对（//host/...）与站内相对（/downloads/...）链接都相对镜像页地址补全
+                        download_url = urljoin(url, download_url)
+                        filename = f"{index}.pdf"  # 使用Excel A列的Index值作为文件名
+                        part_path = path + filename + ".part"
+                        # 流式写盘：先写 .part，完整后再改名
+                        # 首块里没有 %PDF- 标记说明拿到的是 HTML（验证码/错误页），不再继续接收
+                        # 其余字节由 copyfileobj 直接从底层连接拷到文件，省去 iter_content 的逐块生成器开销
+                        # 传输中途出错（含 urllib3 直接抛出的异常）时 size 仍为 0，finally 中清掉残留的 .part
+                        size = 0
+                        not_pdf = False
+                        try:
+                            with session.get(download_url, headers=head, timeout=10, stream=True) as download_r:
+                                if download_r.status_code == 200:
+                                    download_r.raw.decode_content = True
+                                    first = download_r.raw.read(1 << 20)
+                                    if b"%PDF-" not in first[:1024]:
+                                        not_pdf = bool(first)
+                                    else:
+                                        with open(part_path, "wb", buffering=1 << 20) as file:
+                                            file.write(first)
+                                            shutil.copyfileobj(download_r.raw, file, 1 << 20)
+                                            size = file.tell()
+                        finally:
+                            if not size and os.path.exists(part_path):
+                                os.remove(part_path)
+                        if size:
+                            os.replace(part_path, path + filename)
                             print(f"文献下载完成: {filename} (DOI: {doi})")
                             return  # 成功后直接退出函数
                         else:
-                            print(f"下载失败，未获取内容: {doi}")
+                            print(f"下载失败，返回内容不是 PDF: {doi}" if not_pdf else f"下载失败，未获取内容: {doi}")
                     else:
                         print(f"未找到下载链接: {doi}")
                 else:
                     print(f"请求失败，状态码: {r.status_code}, 镜像: {mirror}, DOI: {doi}")
+                    retry_after = r.headers.get("Retry-After") if r.status_code in (429, 503) else None
+                    mirror_backoff(fail, retry_after)
             except Exception as e:
                 print(f"镜像 {mirror} 出错: {e}, DOI: {doi}")
-            time.sleep(random.uniform(2, 5))  # 随机延迟
+                # 直接读 raw 时，传输中途的断连/读超时以 urllib3 异常抛出，不会被包装成 requests 异常
+                if isinstance(e, (requests.RequestException, urllib3.exceptions.HTTPError)):
+                    mirror_backoff(record_mirror(mirror, False))
     # 如果所有尝试均失败，记录错误
     print(f"完全失败，无法下载 DOI: {doi}")
     log_error(doi, index)
 
+# 错误日志文件只打开一次（行缓冲，每条写完即落盘），退出时关闭
+error_file = open("doi-nofinded-scihub.txt", "a", buffering=1)
+atexit.register(error_file.close)
+
 # 错误日志记录函数
 def log_error(doi, index):
     with lock:
-        with open("doi-nofinded-scihub.txt", "a+") as error_file:
-            error_file.write(f"{index}: {doi}\n")
+        error_file.write(f"{index}: {doi}\n")
 
 # 读取Excel文件中的DOI和Index数据
 excel_file_path = "/Users/rogeryang/Desktop/文献数据挖掘/Task7.xlsx"
-df = pd.read_excel(excel_file_path)
 
 # Index在第1列（索引0），DOI在第5列（索引4）
 index_column = 0  # Index列
 doi_column = 4    # DOI列
 
-# 获取Index和DOI数据
-data = df[[df.columns[index_column], df.columns[doi_column]]].dropna()
-indexes = data.iloc[:, 0].tolist()  # Index列
-dois = data.iloc[:, 1].tolist()     # DOI列
+# 只解析 Index 和 DOI 两列，跳过其余列的解析
+sheet = pd.read_excel(excel_file_path, usecols=[index_column, doi_column], dtype=object).dropna()
+# DOI 列整体去掉首尾空白并丢弃空串（向量化完成），避免带空格的 DOI 拼出无效镜像地址、或与同一 DOI 去重不到一起
+doi_header = sheet.columns[1]
+sheet[doi_header] = sheet[doi_header].astype(str).str.strip()
+sheet = sheet[sheet[doi_header] != ""]
+total_rows = len(sheet)
+
+print(f"从Excel文件读取到 {total_rows} 个DOI和对应的Index")
 
-print(f"从Excel文件读取到 {len(dois)} 个DOI和对应的Index")
+# 同一 DOI 只下载一次（保留首次出现的 Index），由 pandas 向量化去重，不再逐行查集合
+data = sheet.drop_duplicates(subset=doi_header).to_numpy()
+indexes = data[:, 0].tolist()  # Index列
+dois = data[:, 1].tolist()     # DOI列
+unique_pairs = list(zip(dois, indexes))
+# 重复行各自的 Index 记下来，主文献下载完成后再链接/复制一份，不重复下载
+primary_index = dict(unique_pairs)
+alias_pairs = [(doi, primary_index[doi], index) for index, doi in sheet[sheet.duplicated(subset=doi_header)].to_numpy().tolist()]
+if len(unique_pairs) < total_rows:
+    print(f"去除重复 DOI {total_rows - len(unique_pairs)} 个")
+
+# 之前的运行已下载过的文献直接跳过：一次 scandir 建好已有文件名集合，不再逐条 stat
+existing_pdfs = {entry.name for entry in os.scandir(path) if entry.name.endswith(".pdf")}
+pending_pairs = [(doi, index) for doi, index in unique_pairs if f"{index}.pdf" not in existing_pdfs]
+if len(pending_pairs) < len(unique_pairs):
+    print(f"已存在，跳过 {len(unique_pairs) - len(pending_pairs)} 个")
 
 # 使用线程池并打印运行流程
-with concurrent.futures.ThreadPoolExecutor(max_workers=12) as executor:
+with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
     # 提交任务到线程池，传递DOI和对应的Index
-    futures = [executor.submit(download_paper, doi, index) for doi, index in zip(dois, indexes)]
+    futures = [executor.submit(download_paper, doi, index) for doi, index in pending_pairs]
 
     # 等待任务完成并处理异常
     for future in concurrent.futures.as_completed(futures):
@@ -101,3 +204,22 @@ with concurrent.futures.ThreadPoolExecutor(max_workers=12) as executor:
             result = future.result()
         except Exception as e:
             print(f"线程任务出错: {e}")
+
+# 重复 DOI 的其余 Index：主文献已存在时硬链接过去（跨设备或不支持时退回复制）
+# 主文献没下到时，这些 Index 同样记入失败日志，便于按日志逐条补下
+linked = 0
+for doi, primary, alias in alias_pairs:
+    primary_file = path + f"{primary}.pdf"
+    alias_file = path + f"{alias}.pdf"
+    if alias == primary or os.path.exists(alias_file):
+        continue
+    if not os.path.exists(primary_file):
+        log_error(doi, alias)
+        continue
+    try:
+        os.link(primary_file, alias_file)
+    except OSError:
+        shutil.copyfile(primary_file, alias_file)
+    linked += 1
+if linked:
+    print(f"重复 DOI 已链接 {linked} 个文件")